@@ -2,16 +2,35 @@
 # System Imports
 # -----------------------------------------------------------------------------
 
-from typing import Optional
+from typing import Optional, Callable, Awaitable, Dict
 from os import getenv
+from functools import wraps, lru_cache
+from importlib.util import find_spec
+from copy import deepcopy
+import asyncio
+import ssl
 
 # -----------------------------------------------------------------------------
 # Public Imports
 # -----------------------------------------------------------------------------
 
-from httpx import AsyncClient
+from httpx import AsyncClient, AsyncHTTPTransport, Limits, Response
 
-# from tenacity import retry, wait_exponential
+# optional packages, installed with the "fast" extra
+
+try:
+    import orjson
+except ImportError:
+    import json as orjson
+
+try:
+    from async_lru import alru_cache
+except ImportError:
+    alru_cache = None
+
+# HTTP/2 support requires the "http2" extra
+
+HTTP2_AVAILABLE = find_spec("h2") is not None
 
 # -----------------------------------------------------------------------------
 # Exports
@@ -41,16 +60,38 @@ class TCPWaveClient(AsyncClient):
     TCPWAVE_SSL_KEY - str
         The path to the client SSL certificate key file
 
+    TCPWAVE_CA - str
+        The path to the CA bundle used to verify the TCPWave server
+        certificate; the system trust store is used by default.
+
+    TCPWAVE_INSECURE - str
+        When set to "1", "true" or "yes" (any case), the TCPWave server
+        certificate is not verified.  Any other value, e.g. "0" or "false",
+        keeps verification on.
+
     TCPWAVE_TOKEN - str
         The preconfigured API token bound to the IP address of the system using
         it (per TCPWave).
 
     TCPWAVE_ORG - str
         The default organizational value to used by APIs that require one.
+
+    Notes
+    -----
+    The client keeps a pool of keep-alive connections to the TCPWave server,
+    using HTTP/2 when the "http2" extra is installed; create a single instance
+    and reuse it across API calls rather than creating one per call.
     """
 
     DEFAULT_PAGE_SZ = 100
     DEFAULT_TIMEOUT = 30
+    DEFAULT_CACHE_SZ = 4096
+    DEFAULT_CACHE_TTL = 300
+    DEFAULT_LIMITS = Limits(
+        max_connections=256, max_keepalive_connections=64, keepalive_expiry=30.0
+    )
+    DEFAULT_RETRIES = 3
+    RETRY_BACKOFF = (4, 8, 10)
 
     def __init__(
         self,
@@ -59,7 +100,8 @@ class TCPWaveClient(AsyncClient):
         **kwargs,
     ):
         kwargs.setdefault("timeout", self.DEFAULT_TIMEOUT)
-        kwargs.setdefault("verify", False)
+        kwargs.setdefault("limits", self.DEFAULT_LIMITS)
+        kwargs.setdefault("http2", HTTP2_AVAILABLE)
         kwargs.setdefault("base_url", getenv("TCPWAVE_ADDR"))
 
         if not kwargs["base_url"]:
@@ -67,13 +109,39 @@ class TCPWaveClient(AsyncClient):
 
         kwargs["base_url"] += "/rest/"
 
-        # (User) client certificate files, if provided
+        # TLS context, shared by all of the clients that use the default
+        # settings, for the same environment variable values, so that it is
+        # created once.  httpx loads a given client certificate into the
+        # context, so in that case it is not shared.
 
-        if "cert" not in kwargs:
-            ssl_cert, ssl_key = getenv("TCPWAVE_SSL_CERT"), getenv("TCPWAVE_SSL_KEY")
+        ssl_ca = getenv("TCPWAVE_CA")
+        ssl_insecure = getenv("TCPWAVE_INSECURE", "").lower() in ("1", "true", "yes")
+        ssl_cert, ssl_key = getenv("TCPWAVE_SSL_CERT"), getenv("TCPWAVE_SSL_KEY")
+
+        if "cert" in kwargs:
+            kwargs.setdefault("verify", _create_ssl_context(ssl_ca, ssl_insecure))
+
+        elif "verify" in kwargs:
             if ssl_cert and ssl_key:
                 kwargs["cert"] = (ssl_cert, ssl_key)
 
+        else:
+            kwargs["verify"] = _shared_ssl_context(
+                ssl_ca, ssl_insecure, ssl_cert, ssl_key
+            )
+
+        # connection failures are retried by the transport, reusing the
+        # connection pool, rather than by re-issuing the request.
+
+        if "transport" not in kwargs:
+            kwargs["transport"] = AsyncHTTPTransport(
+                verify=kwargs["verify"],
+                cert=kwargs.get("cert"),
+                http2=kwargs["http2"],
+                limits=kwargs["limits"],
+                retries=self.DEFAULT_RETRIES,
+            )
+
         super(TCPWaveClient, self).__init__(**kwargs)
 
         if tcpwave_token or (tcpwave_token := getenv("TCPWAVE_TOKEN")):
@@ -81,12 +149,45 @@ class TCPWaveClient(AsyncClient):
 
         self.tcpwave_org = tcpwave_org or getenv("TCPWAVE_ORG")
 
+        # the `cached_api` method caches of this client, by method name
+        self._api_caches: Dict[str, Callable] = {}
+
     @staticmethod
     def simple_api(meth):
+        @wraps(meth)
         async def wrapper(*vargs, **kwargs):
             res = await meth(*vargs, **kwargs)
             res.raise_for_status()
-            return res.json()
+            return orjson.loads(res.content)
+
+        return wrapper
+
+    @staticmethod
+    def cached_api(meth):
+        """
+        Decorator that caches the payloads returned by a `simple_api` method for
+        `DEFAULT_CACHE_TTL` seconds, when the "fast" extra (async-lru) is
+        installed.  Each client instance has its own cache, see
+        `_invalidate_cached_api`, and each call returns a copy of the cached
+        payload so that the caller may modify it.
+        """
+        if alru_cache is None:
+            return meth
+
+        name = meth.__name__
+
+        @wraps(meth)
+        async def wrapper(self, *vargs, **kwargs):
+            if (cached := self._api_caches.get(name)) is None:
+
+                async def _call(*_vargs, **_kwargs):
+                    return await meth(self, *_vargs, **_kwargs)
+
+                cached = self._api_caches[name] = alru_cache(
+                    maxsize=self.DEFAULT_CACHE_SZ, ttl=self.DEFAULT_CACHE_TTL
+                )(_call)
+
+            return deepcopy(await cached(*vargs, **kwargs))
 
         return wrapper
 
@@ -94,14 +195,107 @@ class TCPWaveClient(AsyncClient):
     #                            AsyncClient Overrides
     # -----------------------------------------------------------------------------
 
-    # TODO: may add later depending on how the TCPWave API handles concurrency
-    # async def request(self, *vargs, **kwargs) -> Response:
-    #     @retry(wait=wait_exponential(multiplier=1, min=4, max=10))
-    #     async def _do_rqst():
-    #         res = await super(XiqBaseClient, self).request(*vargs, **kwargs)
-    #         if res.status_code == 400 and 'UNKNOWN' in res.text:
-    #             print("XIQ client request: retry")
-    #             res.raise_for_status()
-    #         return res
-    #
-    #     return await _do_rqst()
+    async def request(self, *vargs, **kwargs) -> Response:
+        """
+        The TCPWave API may respond with a 400 "UNKNOWN" error when it is busy;
+        such requests are retried, see `_retry_busy`.
+        """
+        return await self._retry_busy(
+            lambda: super(TCPWaveClient, self).request(*vargs, **kwargs)
+        )
+
+    # -----------------------------------------------------------------------------
+    #                            PRIVATE METHODS
+    # -----------------------------------------------------------------------------
+
+    def _invalidate_cached_api(self, name: str, *vargs, **kwargs):
+        """
+        This method removes the payload cached by this client for the
+        `cached_api` method `name` called with the given arguments; or all of
+        the payloads cached for that method if no arguments are given.
+        """
+        if (cached := self._api_caches.get(name)) is None:
+            return
+
+        if vargs or kwargs:
+            cached.cache_invalidate(*vargs, **kwargs)
+        else:
+            cached.cache_clear()
+
+    async def _retry_busy(self, send: Callable[[], Awaitable[Response]]) -> Response:
+        """
+        This method issues the request, by calling `send`, and retries it after
+        each of the `RETRY_BACKOFF` delays (seconds) while the TCPWave API
+        responds with a 400 "UNKNOWN" (busy) error.  The body of a streamed
+        400 response is read so that it can be checked.
+
+        Parameters
+        ----------
+        send:
+            Function returning the coroutine that issues the request.
+
+        Returns
+        -------
+        The HTTPx Response of the last attempt.
+        """
+        for backoff in self.RETRY_BACKOFF:
+            res = await send()
+            if res.status_code != 400:
+                return res
+
+            await res.aread()
+            if not self._is_busy(res):
+                return res
+
+            await res.aclose()
+            await asyncio.sleep(backoff)
+
+        return await send()
+
+    @staticmethod
+    def _is_busy(res: Response) -> bool:
+        """
+        This method returns True if the (read) response is the TCPWave 400
+        "UNKNOWN" error that the API returns when it is busy.
+        """
+        return res.status_code == 400 and "UNKNOWN" in res.text
+
+
+# -----------------------------------------------------------------------------
+#                            PRIVATE FUNCTIONS
+# -----------------------------------------------------------------------------
+
+
+def _create_ssl_context(cafile: Optional[str], insecure: bool) -> ssl.SSLContext:
+    """
+    This function returns a new SSL context for verifying the TCPWave server
+    certificate using the CA bundle `cafile`, or the system trust store if
+    None; or not verifying it at all if `insecure`.
+    """
+    ctx = ssl.create_default_context(cafile=cafile)
+
+    if insecure:
+        ctx.check_hostname = False
+        ctx.verify_mode = ssl.CERT_NONE
+
+    return ctx
+
+
+@lru_cache(maxsize=None)
+def _shared_ssl_context(
+    cafile: Optional[str],
+    insecure: bool,
+    ssl_cert: Optional[str],
+    ssl_key: Optional[str],
+) -> ssl.SSLContext:
+    """
+    This function returns the SSL context shared by the clients created with
+    the same settings, including the (user) client certificate files, if
+    provided.
+    """
+    ctx = _create_ssl_context(cafile, insecure)
+
+    if ssl_cert and ssl_key:
+        ctx.load_cert_chain(ssl_cert, ssl_key)
+
+    return ctx
@@ -2,16 +2,49 @@
 # System Imports
 # -----------------------------------------------------------------------------
 
-from typing import Optional, Sequence, Dict, Callable
+from typing import (
+    Optional,
+    Sequence,
+    Dict,
+    Callable,
+    Awaitable,
+    Iterable,
+    Iterator,
+    Tuple,
+    List,
+)
+from itertools import islice
+from copy import deepcopy
 import asyncio
+import re
+import time
+import weakref
 
 # -----------------------------------------------------------------------------
 # Public Imports
 # -----------------------------------------------------------------------------
 
-from httpx import Response, ReadTimeout
+from httpx import Response, ReadTimeout, HTTPStatusError
 from bidict import bidict
 
+# optional packages, installed with the "fast" extra
+
+try:
+    import orjson
+except ImportError:
+    import json as orjson
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    # linear-time regular expression engine
+    import re2
+except ImportError:
+    re2 = None
+
 # -----------------------------------------------------------------------------
 # Private Imports
 # -----------------------------------------------------------------------------
@@ -25,9 +58,51 @@ class TCPWaveDHCP(TCPWaveClient):
     finding active DHCP lease records.
     """
 
+    DEFAULT_CONCURRENCY = 20
+    DEFAULT_QUEUE_SZ = 64
+    DEFAULT_BATCH_SZ = 1
+    LEASE_INDEX_TTL = 30
+
     def __init__(self, *vargs, **kwargs):
         super(TCPWaveDHCP, self).__init__(*vargs, **kwargs)
         self.dhcp_servers = bidict()
+        self._servers_ip_tuple: Tuple[str, ...] = ()
+
+        # whether the dhcpActiveLeases API accepts a comma-separated list of
+        # server IP addresses; None until a batched request has been tried.
+        self._supports_multi_ip: Optional[bool] = None
+
+        # the lease index is built on demand by `build_lease_index`, and then
+        # used by the find methods until it expires.  The same lease may be
+        # reported by more than one DHCP server, e.g. failover peers, so each
+        # key indexes the list of lease records.
+        self._lease_by_ip: Dict[str, List[dict]] = {}
+        self._lease_by_mac: Dict[int, List[dict]] = {}
+        self._lease_names: List[Tuple[str, dict]] = []
+        self._lease_index_ttl: Optional[float] = None
+        self._lease_index_expiry: float = 0.0
+
+        # concurrent lookups share a single refresh of the lease index; the
+        # lock is created when first needed, within the running event loop.
+        self._lease_index_lock: Optional[asyncio.Lock] = None
+        self._lease_index_version = 0
+
+        # the lease fetching tasks that may still be running, for example when
+        # a find method returned before all DHCP servers responded.
+        self._inflight_tasks: "weakref.WeakSet[asyncio.Future]" = weakref.WeakSet()
+
+    async def aclose(self):
+        """
+        This coroutine cancels any lease fetching tasks still running before
+        closing the client connections.
+        """
+        await self._cancel_inflight_tasks()
+        await super(TCPWaveDHCP, self).aclose()
+
+    async def __aexit__(self, *exc_info):
+        # AsyncClient.__aexit__ closes the transport without calling aclose()
+        await self._cancel_inflight_tasks()
+        await super(TCPWaveDHCP, self).__aexit__(*exc_info)
 
     async def fetch_dhcp_servers(self, **params):
         """
@@ -47,12 +122,17 @@ class TCPWaveDHCP(TCPWaveClient):
             "/dhcpserver/list", params=params or dict(orgName=self.tcpwave_org)
         )
         res.raise_for_status()
-        body = res.json()
+        body = orjson.loads(res.content)
         self.dhcp_servers.clear()
         self.dhcp_servers.update({rec["name"]: rec["v4_ipaddress"] for rec in body})
+        self._servers_ip_tuple = tuple(self.dhcp_servers.values())
         return body
 
-    async def fetch_dhcp_leases(self, servers: Optional[Sequence[str]] = None):
+    async def fetch_dhcp_leases(
+        self,
+        servers: Optional[Sequence[str]] = None,
+        batch_size: Optional[int] = None,
+    ):
         """
         This method is used to generate the active DHCP leases found in
         the provided list of servers; or all servers if none provided.
@@ -61,17 +141,23 @@ class TCPWaveDHCP(TCPWaveClient):
         ----------
         servers: list of dhcp server nams
 
+        batch_size: int
+            Optional number of DHCP servers to query per API request;
+            defaults to `DEFAULT_BATCH_SZ`.  If the TCPWave API does not
+            accept multiple servers per request, one request per server is
+            used instead.
+
         Yields
         ------
         DHCP lease record (dict)
         """
-        gen = self._fetch_dhcp_leases_tasker(servers=servers)
+        gen = self._fetch_dhcp_leases_tasker(servers=servers, batch_size=batch_size)
 
-        # pull the tasks from the generator; but they are not used.
-        _ = await gen.__anext__()
-
-        async for rec in gen:
-            yield rec
+        try:
+            async for rec in gen:
+                yield rec
+        finally:
+            await gen.aclose()
 
     async def find_dhcp_lease_ipaddr(
         self, ipaddr: str, servers: Optional[Sequence[str]] = None
@@ -93,21 +179,22 @@ class TCPWaveDHCP(TCPWaveClient):
         -------
         The matching DHCP lease record if found, or None.
         """
-        gen = self._fetch_dhcp_leases_tasker(servers=servers)
-        tasks = await gen.__anext__()
+        if self._lease_index_ttl is not None:
+            await self._refresh_lease_index()
+            return self._from_lease_index(self._lease_by_ip, ipaddr, servers)
 
-        rec: dict
-        async for rec in gen:
-            if rec["address"] == ipaddr:
-                found = rec
-                break
-        else:
-            return None
+        # scan the lease records as they arrive, and stop fetching from all
+        # of the DHCP servers as soon as the lease is found.
 
-        for t in tasks:
-            t.cancel()
+        found_records = await self._scan(
+            lambda rec: rec["address"] == ipaddr, first_only=True, servers=servers
+        )
+
+        if not found_records:
+            return None
 
-        found["dhcpServerName"] = self.dhcp_servers.inv[rec["dhcpServer"]]  # noqa
+        found = found_records[0]
+        found["dhcpServerName"] = self.dhcp_servers.inv[found["dhcpServer"]]  # noqa
         return found
 
     async def find_dhcp_lease_macaddr(
@@ -120,7 +207,8 @@ class TCPWaveDHCP(TCPWaveClient):
         Parameters
         ----------
         macaddr: str
-            The MAC address to find.  The format is "xx:xx:xx:xx:xx:xx".
+            The MAC address to find.  The format is "xx:xx:xx:xx:xx:xx"; either
+            case, and "-" separators, are also accepted.
 
         servers:
             Optional list of DHCP server names.  If not provided, then all
@@ -129,50 +217,244 @@ class TCPWaveDHCP(TCPWaveClient):
         Returns
         -------
         The matching DHCP lease record if found, or None.
+
+        Raises
+        ------
+        ValueError
+            When `macaddr` is not a valid MAC address.
         """
-        gen = self._fetch_dhcp_leases_tasker(servers=servers)
-        tasks = await gen.__anext__()
+        if (target := _mac_key(macaddr)) is None:
+            raise ValueError(f"Invalid MAC address: {macaddr!r}")
 
-        rec: dict
-        async for rec in gen:
-            if rec["mac"] == macaddr:
-                found = rec
-                break
-        else:
-            return None
+        if self._lease_index_ttl is not None:
+            await self._refresh_lease_index()
+            return self._from_lease_index(self._lease_by_mac, target, servers)
 
-        for t in tasks:
-            t.cancel()
+        # scan the lease records as they arrive, and stop fetching from all
+        # of the DHCP servers as soon as the lease is found.
 
-        found["dhcpServerName"] = self.dhcp_servers.inv[rec["dhcpServer"]]  # noqa
+        found_records = await self._scan(
+            lambda rec: _mac_key(rec.get("mac")) == target,
+            first_only=True,
+            servers=servers,
+        )
+
+        if not found_records:
+            return None
+
+        found = found_records[0]
+        found["dhcpServerName"] = self.dhcp_servers.inv[found["dhcpServer"]]  # noqa
         return found
 
-    async def find_dhcp_lease_matching(
-        self, matcher: Callable[[Dict], bool], servers: Optional[Sequence[str]] = None
-    ) -> Sequence[dict]:
-        found_records = list()
+    async def build_lease_index(self, ttl: Optional[float] = None):
+        """
+        This coroutine fetches the active DHCP leases from all DHCP servers once
+        and indexes them by IP address, MAC address, and lowercased name.
+        Thereafter the `find_dhcp_lease_ipaddr`, `find_dhcp_lease_macaddr`, and
+        `find_dhcp_lease_name` (by name) methods use the index, refreshing it
+        when it is older than `ttl` seconds, rather than fetching all leases on
+        each call.
 
-        gen = self._fetch_dhcp_leases_tasker(servers=servers)
+        Parameters
+        ----------
+        ttl: float
+            Optional number of seconds the index is considered fresh; defaults
+            to `LEASE_INDEX_TTL`.
+        """
+        self._lease_index_ttl = self.LEASE_INDEX_TTL if ttl is None else ttl
+        self._lease_index_expiry = 0.0
+        await self._refresh_lease_index()
 
-        # pull the tasks from the generator; not used in this method.
-        _ = await gen.__anext__()
+    def invalidate_leases(self):
+        """
+        This method marks the lease index as stale so that the next find call
+        refreshes it from the DHCP servers.
+        """
+        self._lease_index_expiry = 0.0
 
-        async for rec in gen:
-            if matcher(rec):
-                found_records.append(rec)
+    async def find_dhcp_lease_matching(
+        self, matcher: Callable[[Dict], bool], servers: Optional[Sequence[str]] = None
+    ) -> Sequence[dict]:
+        found_records = await self._scan(matcher, servers=servers)
 
         for found in found_records:
             found["dhcpServerName"] = self.dhcp_servers.inv[found["dhcpServer"]]  # noqa
 
         return found_records
 
+    async def find_dhcp_lease_name(
+        self,
+        name: Optional[str] = None,
+        name_regx: Optional[str] = None,
+        servers: Optional[Sequence[str]] = None,
+    ) -> Sequence[dict]:
+        """
+        This coroutine is used to find all DHCP lease records whose name
+        matches either the given `name` (case-insensitive substring) or the
+        given `name_regx` (case-insensitive regular expression search).
+
+        Parameters
+        ----------
+        name: str
+            The (partial) lease name to find.
+
+        name_regx: str
+            The regular expression to search lease names with.
+
+        servers:
+            Optional list of DHCP server names.  If not provided, then all
+            avaialble DHCP servers will be checked.
+
+        Returns
+        -------
+        List of matching DHCP lease records; empty list if none found.
+        """
+        if name_regx:
+            search = _compile_name_regx(name_regx).search
+
+            def matcher(_rec):
+                _name = _rec.get("name")
+                return _name is not None and search(_name) is not None
+
+        elif name:
+            name = name.lower()
+
+            if self._lease_index_ttl is not None:
+                await self._refresh_lease_index()
+                return [
+                    deepcopy(rec)
+                    for name_lc, rec in self._lease_names
+                    if name in name_lc
+                    and (not servers or rec["dhcpServerName"] in servers)
+                ]
+
+            def matcher(_rec):
+                _name = _rec.get("name")
+                return _name is not None and name in _name.lower()
+
+        else:
+            raise ValueError("Missing required name or name_regx")
+
+        return await self.find_dhcp_lease_matching(matcher, servers=servers)
+
     # -------------------------------------------------------------------------
     #                            PRIVATE METHODS
     # -------------------------------------------------------------------------
 
-    async def _fetch_dhcp_leases_tasker(self, servers: Optional[Sequence[str]] = None):
+    async def _refresh_lease_index(self):
+        """
+        This method rebuilds the lease index, in a single pass over all of the
+        active DHCP leases, if the index has expired.  Lookups that find the
+        index expired while it is being rebuilt wait for that rebuild rather
+        than starting their own.
+        """
+        if time.monotonic() < self._lease_index_expiry:
+            return
+
+        if self._lease_index_lock is None:
+            self._lease_index_lock = asyncio.Lock()
+
+        version = self._lease_index_version
+
+        async with self._lease_index_lock:
+            if self._lease_index_version != version:
+                # rebuilt by a concurrent lookup while waiting for the lock.
+                return
+
+            await self._rebuild_lease_index()
+            self._lease_index_version += 1
+
+    async def _rebuild_lease_index(self):
+        """
+        This method rebuilds the lease index in a single pass over all of the
+        active DHCP leases.
+        """
+        by_ip, by_mac, names = {}, {}, []
+
+        async for rec in self.fetch_dhcp_leases():
+            rec["dhcpServerName"] = self.dhcp_servers.inv[rec["dhcpServer"]]  # noqa
+            by_ip.setdefault(rec["address"], []).append(rec)
+            if (mac_key := _mac_key(rec.get("mac"))) is not None:
+                by_mac.setdefault(mac_key, []).append(rec)
+            names.append(((rec.get("name") or "").lower(), rec))
+
+        self._lease_by_ip, self._lease_by_mac = by_ip, by_mac
+        self._lease_names = names
+        self._lease_index_expiry = time.monotonic() + self._lease_index_ttl
+
+    @staticmethod
+    def _from_lease_index(
+        index: Dict, key, servers: Optional[Sequence[str]] = None
+    ) -> Optional[Dict]:
+        """
+        This method returns a copy of the first indexed lease record for the
+        given key that was obtained from one of the given DHCP servers (names),
+        or from any DHCP server if none are given.  A copy, so that the caller
+        may modify it without changing the index.
+        """
+        for rec in index.get(key, ()):
+            if not servers or rec["dhcpServerName"] in servers:
+                return deepcopy(rec)
+
+        return None
+
+    async def _scan(
+        self,
+        predicate: Callable[[Dict], bool],
+        first_only: bool = False,
+        servers: Optional[Sequence[str]] = None,
+    ) -> List[dict]:
+        """
+        This method returns the DHCP lease records matching the predicate.  The
+        predicate is applied to the lease records as they are parsed, by the
+        tasks fetching them, rather than passing each record through the
+        `_fetch_dhcp_leases_tasker` generator.
+
+        Parameters
+        ----------
+        predicate:
+            Function returning True for a matching lease record.
+
+        first_only: bool
+            When True, stop fetching from all of the DHCP servers as soon as
+            a lease record matches.
+
+        servers:
+            Optional list of DHCP server names.  If not provided, then all
+            avaialble DHCP servers will be checked.
+
+        Returns
+        -------
+        List of matching DHCP lease records; at most one if `first_only`.
+        """
+        found_records = list()
+
+        async def _sink(records: List[dict]):
+            found_records.extend(filter(predicate, records))
+            if first_only and found_records:
+                raise _LeaseFound()
+
+        tasks = await self._start_dhcp_leases_workers(_sink, servers=servers)
+
+        try:
+            await asyncio.gather(*tasks)
+        except _LeaseFound:
+            del found_records[1:]
+        finally:
+            await self._cancel_tasks(tasks)
+
+        return found_records
+
+    async def _fetch_dhcp_leases_tasker(
+        self,
+        servers: Optional[Sequence[str]] = None,
+        concurrency: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ):
         """
-        This method generates DHCP lease records found on the DHCP servers.
+        This method generates DHCP lease records found on the DHCP servers, as
+        they are received.  Closing the generator, e.g. once the caller has
+        found what it needs, cancels the requests that are still in progress.
 
         Parameters
         ----------
@@ -180,45 +462,321 @@ class TCPWaveDHCP(TCPWaveClient):
             Optional list of DHCP server names.  If not provided, then all
             avaialble DHCP servers will be checked.
 
+        concurrency: int
+            Optional limit on the number of API requests issued at the same
+            time; defaults to `DEFAULT_CONCURRENCY`.
+
+        batch_size: int
+            Optional number of DHCP servers to query per API request;
+            defaults to `DEFAULT_BATCH_SZ`.
+
         Yields
         ------
         DHCP lease record (dict)
         """
 
+        # the queue holds lists of lease records, as parsed from each part of
+        # the response bodies received.
+
+        queue = asyncio.Queue(maxsize=self.DEFAULT_QUEUE_SZ)
+
+        workers = await self._start_dhcp_leases_workers(
+            queue.put, servers=servers, concurrency=concurrency, batch_size=batch_size
+        )
+
+        async def _drain():
+            # signal the end of the lease records once all workers are done,
+            # or as soon as one of them fails so that the error is reported.
+            # If cancelled, the consumer is gone and there is no one to signal.
+            try:
+                await asyncio.gather(*workers)
+            except Exception:
+                await queue.put(None)
+                raise
+            await queue.put(None)
+
+        drainer = asyncio.ensure_future(_drain())
+        tasks = [*workers, drainer]
+        self._inflight_tasks.add(drainer)
+
+        try:
+            while (records := await queue.get()) is not None:
+                for rec in records:
+                    yield rec
+
+            await drainer
+
+        finally:
+            await self._cancel_tasks(tasks)
+
+    async def _start_dhcp_leases_workers(
+        self,
+        sink: Callable[[List[dict]], Awaitable],
+        servers: Optional[Sequence[str]] = None,
+        concurrency: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ) -> List[asyncio.Future]:
+        """
+        This method starts the tasks that fetch the active DHCP leases from the
+        DHCP servers, each passing the lease records it parses to the sink.
+
+        Parameters
+        ----------
+        sink:
+            Coroutine function called with each list of lease records parsed.
+
+        servers:
+            Optional list of DHCP server names.  If not provided, then all
+            avaialble DHCP servers will be checked.
+
+        concurrency: int
+            Optional limit on the number of API requests issued at the same
+            time; defaults to `DEFAULT_CONCURRENCY`.
+
+        batch_size: int
+            Optional number of DHCP servers to query per API request;
+            defaults to `DEFAULT_BATCH_SZ`.
+
+        Returns
+        -------
+        List of the tasks started.
+        """
         if not self.dhcp_servers:
             await self.fetch_dhcp_servers()
 
+        if len(self._servers_ip_tuple) != len(self.dhcp_servers):
+            # the servers were added or removed directly, rather than by
+            # `fetch_dhcp_servers`.
+            self._servers_ip_tuple = tuple(self.dhcp_servers.values())
+
         servers_ip = (
-            [self.dhcp_servers[s_] for s_ in servers]
+            tuple(self.dhcp_servers[s_] for s_ in servers)
             if servers
-            else self.dhcp_servers.values()
+            else self._servers_ip_tuple
         )
 
+        sem = asyncio.Semaphore(concurrency or self.DEFAULT_CONCURRENCY)
+
         tasks = [
-            asyncio.ensure_future(
-                self.get(
-                    "/dhcpserver/dhcpActiveLeases", params=dict(serverIp=server_ip)
-                )
-            )
-            for server_ip in servers_ip
+            asyncio.ensure_future(self._fetch_dhcp_leases_worker(batch, sink, sem))
+            for batch in _batched(servers_ip, batch_size or self.DEFAULT_BATCH_SZ)
         ]
 
-        yield tasks
+        self._inflight_tasks.update(tasks)
+        return tasks
+
+    async def _cancel_inflight_tasks(self):
+        """
+        This method cancels the lease fetching tasks still running, e.g. those
+        of a find method that has not yet returned, and waits for them.
+        """
+        await self._cancel_tasks(list(self._inflight_tasks))
+
+    @staticmethod
+    async def _cancel_tasks(tasks: Sequence[asyncio.Future]):
+        """
+        This method cancels the tasks still running and waits for them so that
+        their streamed responses are closed before returning.
+        """
+        for t in tasks:
+            t.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _fetch_dhcp_leases_worker(
+        self,
+        servers_ip: Sequence[str],
+        sink: Callable[[List[dict]], Awaitable],
+        sem: asyncio.Semaphore,
+    ):
+        """
+        This method fetches the active DHCP leases from a batch of DHCP servers
+        and passes the lease records to the sink.  A batch of more than one
+        server is first tried as a single API request.  If the TCPWave API
+        rejects that with a client error, other than busy, while accepting the
+        first server on its own, then the API does not support batches: each
+        server is queried individually and the batched form is not tried again.
+        Any other error is raised.
 
-        for next_page in asyncio.as_completed(tasks):
-            # TODO: due to an "issue" in TCPWave, some DHCP servers may not respond; therefore
-            #       ignore ReadTimeout error until further updates.
+        Parameters
+        ----------
+        servers_ip: list of DHCP server IP addresses
+
+        sink:
+            Coroutine function called with each list of lease records parsed.
+
+        sem: asyncio.Semaphore
+            Bounds the number of API requests issued concurrently
+        """
+        if len(servers_ip) > 1 and self._supports_multi_ip is not False:
             try:
-                res: Response = await next_page
-            except ReadTimeout:
-                continue
-
-            if res.is_error:
-                if res.text.startswith("TIMS-3961"):
-                    # this means the DHCP server could be offline; skipping.
-                    continue
-
-            res.raise_for_status()
-            body = res.json()
-            for rec in body["rows"]:
-                yield rec
+                if await self._fetch_dhcp_leases_rows(",".join(servers_ip), sink, sem):
+                    self._supports_multi_ip = True
+                    return
+
+            except HTTPStatusError as exc:
+                if not exc.response.is_client_error or self._is_busy(exc.response):
+                    raise
+
+                # confirm that it is the list of servers that is rejected; this
+                # raises if the first server on its own is rejected as well.
+
+                await self._fetch_dhcp_leases_rows(servers_ip[0], sink, sem)
+                self._supports_multi_ip = False
+                servers_ip = servers_ip[1:]
+
+        for server_ip in servers_ip:
+            await self._fetch_dhcp_leases_rows(server_ip, sink, sem)
+
+    async def _fetch_dhcp_leases_rows(
+        self,
+        server_ip: str,
+        sink: Callable[[List[dict]], Awaitable],
+        sem: asyncio.Semaphore,
+    ) -> bool:
+        """
+        This method executes a single dhcpActiveLeases API request and passes
+        the lease records to the sink.
+
+        Parameters
+        ----------
+        server_ip: str
+            The DHCP server IP address, or comma-separated addresses
+
+        sink:
+            Coroutine function called with each list of lease records parsed.
+
+        sem: asyncio.Semaphore
+            Bounds the number of API requests issued concurrently
+
+        Returns
+        -------
+        True if the API returned lease records; False if the DHCP server
+        was skipped.
+        """
+        accepted = False
+
+        request = self.build_request(
+            "GET", "/dhcpserver/dhcpActiveLeases", params=dict(serverIp=server_ip)
+        )
+
+        # TODO: due to an "issue" in TCPWave, some DHCP servers may not respond; therefore
+        #       ignore ReadTimeout error until further updates.
+        try:
+            async with sem:
+                # the response is returned once its headers are received, so
+                # that the body is parsed while the rest of it is in flight.
+
+                res = await self._retry_busy(lambda: self.send(request, stream=True))
+
+                try:
+                    if res.is_error:
+                        await res.aread()
+                        if res.text.startswith("TIMS-3961"):
+                            # this means the DHCP server could be offline; skipping.
+                            return False
+
+                        res.raise_for_status()
+
+                    accepted = True
+                    await self._parse_dhcp_leases(res, sink)
+
+                finally:
+                    # when cancelled, e.g. once a lease is found, this closes the
+                    # connection rather than reading the rest of the body.
+                    await res.aclose()
+
+        except ReadTimeout:
+            pass
+
+        return accepted
+
+    @staticmethod
+    async def _parse_dhcp_leases(
+        res: Response, sink: Callable[[List[dict]], Awaitable]
+    ):
+        """
+        This method parses the lease records from the dhcpActiveLeases response
+        body as it arrives, rather than waiting for, and then loading, the
+        entire body; passing the records parsed from each part of the body to
+        the sink.
+
+        Parameters
+        ----------
+        res: Response
+            The streamed dhcpActiveLeases response
+
+        sink:
+            Coroutine function called with each list of lease records parsed.
+        """
+        if ijson is None:
+            await res.aread()
+            await sink(orjson.loads(res.content)["rows"])
+            return
+
+        records = ijson.sendable_list()
+        parser = ijson.items_coro(records, "rows.item", use_float=True)
+
+        async for chunk in res.aiter_bytes():
+            parser.send(chunk)
+            if records:
+                await sink(records[:])
+                del records[:]
+
+        parser.close()
+        if records:
+            await sink(records[:])
+
+
+class _LeaseFound(Exception):
+    """
+    Raised by the `_scan` sink to stop all of the fetching tasks once the
+    first matching lease record is found.
+    """
+
+
+_MAC_DIGITS = re.compile(r"[0-9a-fA-F]{12}")
+
+
+def _mac_key(macaddr: Optional[str]) -> Optional[int]:
+    """
+    This function returns the MAC address as an integer so that MAC addresses
+    compare equal regardless of case or separator; or None if the value is not
+    a MAC address, e.g. missing or empty in a lease record.
+    """
+    if not isinstance(macaddr, str):
+        return None
+
+    digits = macaddr.replace(":", "").replace("-", "")
+    if not _MAC_DIGITS.fullmatch(digits):
+        return None
+
+    return int(digits, 16)
+
+
+def _compile_name_regx(name_regx: str):
+    """
+    This function compiles the case-insensitive lease name regular expression
+    using RE2, when installed, so that scanning many lease names runs in linear
+    time.  Expressions that RE2 does not support, e.g. back-references, are
+    compiled with the standard `re` module.
+    """
+    if re2 is not None:
+        options = re2.Options()
+        options.case_sensitive = False
+        options.log_errors = False
+        try:
+            return re2.compile(name_regx, options)
+        except re2.error:
+            pass
+
+    return re.compile(name_regx, re.IGNORECASE)
+
+
+def _batched(items: Iterable[str], size: int) -> Iterator[Tuple[str, ...]]:
+    """
+    This function generates tuples of up to `size` consecutive items.
+    """
+    items = iter(items)
+    while batch := tuple(islice(items, size)):
+        yield batch
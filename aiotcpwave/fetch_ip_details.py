@@ -2,15 +2,7 @@
 # System Imports
 # -----------------------------------------------------------------------------
 
-from typing import Optional, Sequence, Dict, Callable
-import asyncio
-
-# -----------------------------------------------------------------------------
-# Public Imports
-# -----------------------------------------------------------------------------
-
-from httpx import Response, ReadTimeout
-from bidict import bidict
+from typing import Optional
 
 # -----------------------------------------------------------------------------
 # Private Imports
@@ -24,11 +16,13 @@ class TCPWaveFetchIpDetails(TCPWaveClient):
     This mixin client is used to obtain object details, e.g., hostname
     """
 
+    @TCPWaveClient.cached_api
     @TCPWaveClient.simple_api
     async def fetch_ip_details(self, ip_address: str):
         """
         This returns the API record for the given IP Address.  The API
-        record includes fields such as the name.
+        record includes fields such as the name.  Records are cached for
+        `DEFAULT_CACHE_TTL` seconds; see `invalidate_ip_details`.
 
         Parameters
         ----------
@@ -40,3 +34,18 @@ class TCPWaveFetchIpDetails(TCPWaveClient):
         HTTPx Response; the decorator will return the payload dictionary
         """
         return await self.get('/home/getObjectDetails', params=dict(ipAddress=ip_address))
+
+    def invalidate_ip_details(self, ip_address: Optional[str] = None):
+        """
+        This removes the API record cached by this client for the given IP
+        address, or all of its cached records if no IP address is provided.
+
+        Parameters
+        ----------
+        ip_address: str
+            The IP address, for example "239.128.1.5"
+        """
+        if ip_address is None:
+            self._invalidate_cached_api("fetch_ip_details")
+        else:
+            self._invalidate_cached_api("fetch_ip_details", ip_address)
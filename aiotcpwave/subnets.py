@@ -2,15 +2,7 @@
 # System Imports
 # -----------------------------------------------------------------------------
 
-from typing import Optional, Sequence, Dict, Callable
-import asyncio
-
-# -----------------------------------------------------------------------------
-# Public Imports
-# -----------------------------------------------------------------------------
-
-from httpx import Response, ReadTimeout
-from bidict import bidict
+from typing import Optional
 
 # -----------------------------------------------------------------------------
 # Private Imports
@@ -24,12 +16,14 @@ class TCPWaveSubnets(TCPWaveClient):
     This mixin client is used for subnet related actions
     """
 
+    @TCPWaveClient.cached_api
     @TCPWaveClient.simple_api
     async def fetch_subnet_details(self, subnet: str):
         """
         This returns the API record about the given subnet.  The API
         record includes fields such as the name and subnet prefix-length
-        value.
+        value.  Records are cached for `DEFAULT_CACHE_TTL` seconds; see
+        `invalidate_subnet_details`.
 
         Parameters
         ----------
@@ -41,3 +35,18 @@ class TCPWaveSubnets(TCPWaveClient):
         HTTPx Response; the decorator will return the payload dictionary
         """
         return await self.get('/object/getSnAddr', params=dict(address=subnet))
+
+    def invalidate_subnet_details(self, subnet: Optional[str] = None):
+        """
+        This removes the API record cached by this client for the given subnet,
+        or all of its cached records if no subnet is provided.
+
+        Parameters
+        ----------
+        subnet: str
+            The subnet IP address, for example "172.10.2.0"
+        """
+        if subnet is None:
+            self._invalidate_cached_api("fetch_subnet_details")
+        else:
+            self._invalidate_cached_api("fetch_subnet_details", subnet)
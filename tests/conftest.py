@@ -0,0 +1,27 @@
+# -----------------------------------------------------------------------------
+# Public Imports
+# -----------------------------------------------------------------------------
+
+import pytest
+
+
+TCPWAVE_ENV = (
+    "TCPWAVE_ADDR",
+    "TCPWAVE_TOKEN",
+    "TCPWAVE_ORG",
+    "TCPWAVE_SSL_CERT",
+    "TCPWAVE_SSL_KEY",
+    "TCPWAVE_CA",
+    "TCPWAVE_INSECURE",
+)
+
+
+@pytest.fixture(autouse=True)
+def tcpwave_env(monkeypatch):
+    """
+    Isolates the tests from the TCPWave environment variables of the system.
+    """
+    for var in TCPWAVE_ENV:
+        monkeypatch.delenv(var, raising=False)
+
+    monkeypatch.setenv("TCPWAVE_ADDR", "https://tcpwave.example")
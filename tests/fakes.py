@@ -0,0 +1,101 @@
+"""
+Mock TCPWave API used by the tests.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Dict, List, Callable
+import asyncio
+import json
+
+# -----------------------------------------------------------------------------
+# Public Imports
+# -----------------------------------------------------------------------------
+
+import httpx
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from aiotcpwave.dhcp import TCPWaveDHCP
+
+
+def lease(address: str, mac: str, name: str = "") -> dict:
+    """
+    Returns a DHCP lease record; the dhcpServer field is set by FakeTCPWave.
+    """
+    return dict(address=address, mac=mac, name=name)
+
+
+class SlowStream(httpx.AsyncByteStream):
+    """
+    Response body that sends the first part and then stalls, recording whether
+    the client closed it.
+    """
+
+    def __init__(self, first: bytes):
+        self.first = first
+        self.closed = False
+
+    async def __aiter__(self):
+        yield self.first
+        await asyncio.sleep(60)
+        yield b"]}"
+
+    async def aclose(self):
+        self.closed = True
+
+
+class FakeTCPWave:
+    """
+    Mock TCPWave API serving the DHCP server list and the active DHCP leases of
+    each server.  A comma-separated serverIp is rejected unless `multi_ip`.
+    """
+
+    def __init__(self, leases: Dict[str, List[dict]], multi_ip: bool = False):
+        self.servers = {name: f"10.0.0.{n}" for n, name in enumerate(leases, start=1)}
+        self.leases = {
+            self.servers[name]: [
+                dict(rec, dhcpServer=self.servers[name]) for rec in recs
+            ]
+            for name, recs in leases.items()
+        }
+        self.multi_ip = multi_ip
+        self.calls: List[str] = []
+        self.responders: Dict[str, Callable[[httpx.Request], httpx.Response]] = {}
+
+    def client(self, cls=TCPWaveDHCP, **kwargs):
+        return cls(transport=httpx.MockTransport(self.handler), **kwargs)
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/dhcpserver/list"):
+            return httpx.Response(
+                200,
+                json=[
+                    dict(name=name, v4_ipaddress=ip)
+                    for name, ip in self.servers.items()
+                ],
+            )
+
+        server_ip = request.url.params["serverIp"]
+        self.calls.append(server_ip)
+
+        if responder := self.responders.get(server_ip):
+            return responder(request)
+
+        if "," in server_ip and not self.multi_ip:
+            return httpx.Response(400, text="TIMS-1102 invalid serverIp")
+
+        rows = [rec for ip in server_ip.split(",") for rec in self.leases[ip]]
+        return httpx.Response(200, content=json.dumps(dict(rows=rows)).encode())
+
+
+def slow_rows_stream(rows: List[dict]) -> SlowStream:
+    """
+    Returns a response body that sends the given lease records and then stalls
+    before completing.
+    """
+    return SlowStream(json.dumps(dict(rows=rows))[:-2].encode())
@@ -0,0 +1,48 @@
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+import ssl
+
+# -----------------------------------------------------------------------------
+# Public Imports
+# -----------------------------------------------------------------------------
+
+import pytest
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from aiotcpwave.client import TCPWaveClient
+
+
+def ssl_context(api: TCPWaveClient) -> ssl.SSLContext:
+    return api._transport._pool._ssl_context
+
+
+def test_client_ssl_context_shared():
+    assert ssl_context(TCPWaveClient()) is ssl_context(TCPWaveClient())
+    assert ssl_context(TCPWaveClient()).verify_mode == ssl.CERT_REQUIRED
+
+
+def test_client_ssl_context_follows_env(monkeypatch):
+    api = TCPWaveClient()
+    monkeypatch.setenv("TCPWAVE_INSECURE", "1")
+    api_insecure = TCPWaveClient()
+
+    assert ssl_context(api).verify_mode == ssl.CERT_REQUIRED
+    assert ssl_context(api_insecure).verify_mode == ssl.CERT_NONE
+    assert not ssl_context(api_insecure).check_hostname
+
+
+@pytest.mark.parametrize("value", ["0", "false", "no", ""])
+def test_client_ssl_insecure_requires_truthy_value(monkeypatch, value):
+    monkeypatch.setenv("TCPWAVE_INSECURE", value)
+    assert ssl_context(TCPWaveClient()).verify_mode == ssl.CERT_REQUIRED
+
+
+@pytest.mark.parametrize("value", ["1", "TRUE", "yes"])
+def test_client_ssl_insecure_truthy_values(monkeypatch, value):
+    monkeypatch.setenv("TCPWAVE_INSECURE", value)
+    assert ssl_context(TCPWaveClient()).verify_mode == ssl.CERT_NONE
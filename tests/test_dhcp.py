@@ -0,0 +1,346 @@
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+import asyncio
+
+# -----------------------------------------------------------------------------
+# Public Imports
+# -----------------------------------------------------------------------------
+
+import pytest
+import httpx
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from aiotcpwave import dhcp
+from aiotcpwave.dhcp import TCPWaveDHCP
+from .fakes import FakeTCPWave, lease, slow_rows_stream
+
+
+def test_dhcp_client_base_url():
+    api = TCPWaveDHCP(
+        tcpwave_token="token", tcpwave_org="org", base_url="https://tims.example"
+    )
+    assert api.base_url == "https://tims.example/rest/"
+    assert api.headers["TIMS-Session-Token"] == "token"
+    assert api.tcpwave_org == "org"
+
+
+def test_dhcp_client_missing_base_url(monkeypatch):
+    monkeypatch.delenv("TCPWAVE_ADDR")
+    with pytest.raises(RuntimeError):
+        TCPWaveDHCP()
+
+
+@pytest.mark.asyncio
+async def test_fetch_dhcp_leases():
+    tcpwave = FakeTCPWave(
+        dict(
+            s1=[lease("192.168.1.1", "aa:bb:cc:00:01:01")],
+            s2=[lease("192.168.2.1", "aa:bb:cc:00:02:01")],
+        )
+    )
+    async with tcpwave.client() as api:
+        leases = [rec async for rec in api.fetch_dhcp_leases()]
+
+    assert sorted(rec["address"] for rec in leases) == ["192.168.1.1", "192.168.2.1"]
+
+
+@pytest.mark.asyncio
+async def test_find_dhcp_lease_ipaddr_cancels_slower_servers():
+    tcpwave = FakeTCPWave(
+        dict(
+            s1=[lease("192.168.1.1", "aa:bb:cc:00:01:01")],
+            s2=[lease("192.168.2.1", "aa:bb:cc:00:02:01")],
+        )
+    )
+    slow = slow_rows_stream(
+        [dict(lease("192.168.2.1", "aa:bb:cc:00:02:01"), dhcpServer="10.0.0.2")]
+    )
+    tcpwave.responders["10.0.0.2"] = lambda _rqst: httpx.Response(200, stream=slow)
+
+    async with tcpwave.client() as api:
+        found = await asyncio.wait_for(api.find_dhcp_lease_ipaddr("192.168.1.1"), 5)
+
+        assert found["dhcpServerName"] == "s1"
+        assert slow.closed
+        assert not [t for t in api._inflight_tasks if not t.done()]
+
+
+@pytest.mark.asyncio
+async def test_find_dhcp_lease_ipaddr_not_found():
+    tcpwave = FakeTCPWave(dict(s1=[lease("192.168.1.1", "aa:bb:cc:00:01:01")]))
+
+    async with tcpwave.client() as api:
+        assert await api.find_dhcp_lease_ipaddr("192.168.9.9") is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(dhcp.ijson is None, reason="streamed parsing requires ijson")
+async def test_fetch_dhcp_leases_close_cancels_requests():
+    tcpwave = FakeTCPWave(dict(s1=[], s2=[]))
+    slow = slow_rows_stream([lease("192.168.2.1", "aa:bb:cc:00:02:01")])
+    tcpwave.responders["10.0.0.2"] = lambda _rqst: httpx.Response(200, stream=slow)
+
+    async with tcpwave.client() as api:
+        leases = api.fetch_dhcp_leases()
+        first = await asyncio.wait_for(leases.__anext__(), timeout=5)
+        assert first["address"] == "192.168.2.1"
+        await leases.aclose()
+
+        assert slow.closed
+        assert not [t for t in api._inflight_tasks if not t.done()]
+
+
+def three_servers(**kwargs) -> FakeTCPWave:
+    return FakeTCPWave(
+        dict(
+            s1=[lease("192.168.1.1", "aa:bb:cc:00:01:01")],
+            s2=[lease("192.168.2.1", "aa:bb:cc:00:02:01")],
+            s3=[lease("192.168.3.1", "aa:bb:cc:00:03:01")],
+        ),
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_fetch_dhcp_leases_batched():
+    tcpwave = three_servers(multi_ip=True)
+
+    async with tcpwave.client() as api:
+        leases = [rec async for rec in api.fetch_dhcp_leases(batch_size=3)]
+        assert api._supports_multi_ip is True
+
+    assert len(leases) == 3
+    assert tcpwave.calls == ["10.0.0.1,10.0.0.2,10.0.0.3"]
+
+
+@pytest.mark.asyncio
+async def test_fetch_dhcp_leases_batch_rejected_falls_back():
+    tcpwave = three_servers()
+
+    async with tcpwave.client() as api:
+        leases = [rec async for rec in api.fetch_dhcp_leases(batch_size=3)]
+        assert api._supports_multi_ip is False
+
+        # the batched form is not tried again
+
+        tcpwave.calls.clear()
+        leases_again = [rec async for rec in api.fetch_dhcp_leases(batch_size=3)]
+
+    assert len(leases) == len(leases_again) == 3
+    assert sorted(tcpwave.calls) == ["10.0.0.1", "10.0.0.2", "10.0.0.3"]
+
+
+@pytest.mark.asyncio
+async def test_fetch_dhcp_leases_batch_busy_keeps_batching(monkeypatch):
+    monkeypatch.setattr(TCPWaveDHCP, "RETRY_BACKOFF", (0,))
+    tcpwave = three_servers(multi_ip=True)
+    tcpwave.responders["10.0.0.1,10.0.0.2,10.0.0.3"] = lambda _rqst: httpx.Response(
+        400, text="UNKNOWN error"
+    )
+
+    async with tcpwave.client() as api:
+        with pytest.raises(httpx.HTTPStatusError):
+            _ = [rec async for rec in api.fetch_dhcp_leases(batch_size=3)]
+
+        assert api._supports_multi_ip is None
+
+
+@pytest.mark.asyncio
+async def test_fetch_dhcp_leases_batch_error_not_multi_ip():
+    tcpwave = three_servers()
+    tcpwave.responders["10.0.0.1"] = lambda _rqst: httpx.Response(
+        403, text="TIMS-1001 not authorized"
+    )
+
+    async with tcpwave.client() as api:
+        with pytest.raises(httpx.HTTPStatusError):
+            _ = [rec async for rec in api.fetch_dhcp_leases(batch_size=3)]
+
+        assert api._supports_multi_ip is None
+
+
+def failover_peers() -> FakeTCPWave:
+    shared = lease("192.168.1.1", "aa:bb:cc:00:01:01", "Host-1")
+    return FakeTCPWave(
+        dict(s1=[shared], s2=[shared, lease("192.168.2.1", "aa:bb:cc:00:02:01")])
+    )
+
+
+@pytest.mark.asyncio
+async def test_lease_index_lookups():
+    tcpwave = failover_peers()
+
+    async with tcpwave.client() as api:
+        await api.build_lease_index()
+        tcpwave.calls.clear()
+
+        found = await api.find_dhcp_lease_ipaddr("192.168.2.1")
+        assert found["dhcpServerName"] == "s2"
+
+        found = await api.find_dhcp_lease_macaddr("AA-BB-CC-00-01-01")
+        assert found["address"] == "192.168.1.1"
+
+        assert await api.find_dhcp_lease_ipaddr("192.168.9.9") is None
+        assert len(await api.find_dhcp_lease_name("host-1")) == 2
+
+        # the results are copies, modifying them does not change the index
+
+        found["address"] = "changed"
+        for rec in await api.find_dhcp_lease_name("host-1"):
+            rec["address"] = "changed"
+
+        found = await api.find_dhcp_lease_ipaddr("192.168.1.1")
+        assert found["address"] == "192.168.1.1"
+        found = await api.find_dhcp_lease_macaddr("aa:bb:cc:00:01:01")
+        assert found["address"] == "192.168.1.1"
+
+        # the lookups are answered from the index
+
+        assert tcpwave.calls == []
+
+
+@pytest.mark.asyncio
+async def test_lease_index_servers_filter():
+    tcpwave = failover_peers()
+
+    async with tcpwave.client() as api:
+        await api.build_lease_index()
+
+        for server in ("s1", "s2"):
+            found = await api.find_dhcp_lease_ipaddr("192.168.1.1", servers=[server])
+            assert found["dhcpServerName"] == server
+
+            found = await api.find_dhcp_lease_macaddr(
+                "aa:bb:cc:00:01:01", servers=[server]
+            )
+            assert found["dhcpServerName"] == server
+
+        assert await api.find_dhcp_lease_ipaddr("192.168.2.1", servers=["s1"]) is None
+
+
+@pytest.mark.asyncio
+async def test_lease_index_refresh():
+    tcpwave = failover_peers()
+
+    async with tcpwave.client() as api:
+        await api.build_lease_index(ttl=0)
+        tcpwave.calls.clear()
+
+        # a zero TTL refreshes the index on every lookup
+
+        await api.find_dhcp_lease_ipaddr("192.168.1.1")
+        assert sorted(tcpwave.calls) == ["10.0.0.1", "10.0.0.2"]
+
+        await api.build_lease_index()
+        tcpwave.calls.clear()
+
+        await api.find_dhcp_lease_ipaddr("192.168.1.1")
+        assert tcpwave.calls == []
+
+        api.invalidate_leases()
+        await api.find_dhcp_lease_ipaddr("192.168.1.1")
+        assert sorted(tcpwave.calls) == ["10.0.0.1", "10.0.0.2"]
+
+
+@pytest.mark.asyncio
+async def test_find_dhcp_lease_macaddr_skips_invalid_macs():
+    tcpwave = FakeTCPWave(
+        dict(
+            s1=[
+                lease("192.168.1.1", ""),
+                dict(address="192.168.1.2", mac=None),
+                lease("192.168.1.3", "not-a-mac"),
+                lease("192.168.1.4", "aa:bb:cc:00:01:04"),
+            ]
+        )
+    )
+
+    async with tcpwave.client() as api:
+        found = await api.find_dhcp_lease_macaddr("AA:BB:CC:00:01:04")
+        assert found["address"] == "192.168.1.4"
+
+        await api.build_lease_index()
+        found = await api.find_dhcp_lease_macaddr("aa-bb-cc-00-01-04")
+        assert found["address"] == "192.168.1.4"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "macaddr", ["aa:bb:cc", "0x1234567890", " abbcc000104", "a_bbcc000104"]
+)
+async def test_find_dhcp_lease_macaddr_invalid_macaddr(macaddr):
+    tcpwave = FakeTCPWave(dict(s1=[]))
+
+    async with tcpwave.client() as api:
+        with pytest.raises(ValueError):
+            await api.find_dhcp_lease_macaddr(macaddr)
+
+
+@pytest.mark.asyncio
+async def test_find_dhcp_lease_ipaddr_retries_busy(monkeypatch):
+    monkeypatch.setattr(TCPWaveDHCP, "RETRY_BACKOFF", (0, 0))
+    tcpwave = FakeTCPWave(dict(s1=[lease("192.168.1.1", "aa:bb:cc:00:01:01")]))
+
+    def _busy_once(_rqst):
+        del tcpwave.responders["10.0.0.1"]
+        return httpx.Response(400, text="UNKNOWN error")
+
+    tcpwave.responders["10.0.0.1"] = _busy_once
+
+    async with tcpwave.client() as api:
+        found = await api.find_dhcp_lease_ipaddr("192.168.1.1")
+
+    assert found["address"] == "192.168.1.1"
+    assert tcpwave.calls == ["10.0.0.1", "10.0.0.1"]
+
+
+@pytest.mark.asyncio
+async def test_leaving_client_context_cancels_lease_tasks():
+    tcpwave = FakeTCPWave(dict(s1=[]))
+    slow = slow_rows_stream([])
+    tcpwave.responders["10.0.0.1"] = lambda _rqst: httpx.Response(200, stream=slow)
+
+    async with tcpwave.client() as api:
+        finding = asyncio.ensure_future(api.find_dhcp_lease_ipaddr("192.168.1.1"))
+        while not tcpwave.calls:
+            await asyncio.sleep(0.01)
+
+    assert slow.closed
+    assert not [t for t in api._inflight_tasks if not t.done()]
+
+    with pytest.raises(asyncio.CancelledError):
+        await finding
+
+
+@pytest.mark.asyncio
+async def test_lease_index_concurrent_refresh():
+    tcpwave = failover_peers()
+
+    async with tcpwave.client() as api:
+        await api.build_lease_index()
+        api.invalidate_leases()
+        tcpwave.calls.clear()
+
+        found = await asyncio.gather(
+            *(api.find_dhcp_lease_ipaddr("192.168.1.1") for _ in range(10))
+        )
+
+    assert all(rec["address"] == "192.168.1.1" for rec in found)
+    assert sorted(tcpwave.calls) == ["10.0.0.1", "10.0.0.2"]
+
+
+@pytest.mark.asyncio
+async def test_find_dhcp_lease_ipaddr_dhcp_servers_set_directly():
+    tcpwave = FakeTCPWave(dict(s1=[lease("192.168.1.1", "aa:bb:cc:00:01:01")]))
+
+    async with tcpwave.client() as api:
+        api.dhcp_servers["s1"] = "10.0.0.1"
+        found = await api.find_dhcp_lease_ipaddr("192.168.1.1")
+
+    assert found["dhcpServerName"] == "s1"
+    assert tcpwave.calls == ["10.0.0.1"]
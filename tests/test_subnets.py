@@ -0,0 +1,79 @@
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+import gc
+import weakref
+
+# -----------------------------------------------------------------------------
+# Public Imports
+# -----------------------------------------------------------------------------
+
+import pytest
+import httpx
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from aiotcpwave.subnets import TCPWaveSubnets
+
+# the payload cache requires the "fast" extra (async-lru)
+pytest.importorskip("async_lru")
+
+
+class FakeSubnets:
+    """
+    Mock TCPWave getSnAddr API, counting the requests made.
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        return httpx.Response(
+            200, json=dict(name="subnet", address=request.url.params["address"])
+        )
+
+    def client(self) -> TCPWaveSubnets:
+        return TCPWaveSubnets(transport=httpx.MockTransport(self.handler))
+
+
+@pytest.mark.asyncio
+async def test_fetch_subnet_details_cached():
+    tcpwave = FakeSubnets()
+
+    async with tcpwave.client() as api:
+        details = await api.fetch_subnet_details("172.10.2.0")
+        details["name"] = "changed"
+
+        # cached, and the cached payload is not modified by the caller
+
+        assert (await api.fetch_subnet_details("172.10.2.0"))["name"] == "subnet"
+        assert tcpwave.calls == 1
+
+        api.invalidate_subnet_details("172.10.2.0")
+        await api.fetch_subnet_details("172.10.2.0")
+        assert tcpwave.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_fetch_subnet_details_cache_per_client():
+    tcpwave = FakeSubnets()
+
+    async with tcpwave.client() as api1, tcpwave.client() as api2:
+        await api1.fetch_subnet_details("172.10.2.0")
+        await api2.fetch_subnet_details("172.10.2.0")
+        assert tcpwave.calls == 2
+
+        api2.invalidate_subnet_details()
+        await api1.fetch_subnet_details("172.10.2.0")
+        assert tcpwave.calls == 2
+
+    # the cache does not keep closed clients alive
+
+    api2_ref = weakref.ref(api2)
+    del api2
+    gc.collect()
+    assert api2_ref() is None